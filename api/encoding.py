@@ -0,0 +1,196 @@
+from __future__ import annotations
+import gzip
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+
+from app import tracing
+
+# Opsiyonel bağımlılıklar: kurulu değilse JSON / gzip ile devam edilir
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - ortama bağlı
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - ortama bağlı
+    brotli = None
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
+
+# Bu boyutun altındaki gövdeler sıkıştırılmaz (header + CPU maliyeti kazancı geçer)
+COMPRESS_MIN_BYTES = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+# Tekrarlanan string'ler için msgpack ext tipi: payload = tablo indeksi
+STRING_REF_EXT = 1
+# Bundan kısa string'leri referansa çevirmek kazandırmaz (fixext1 = 3 byte)
+INTERN_MIN_LEN = 4
+
+
+def _parse_accept(header: Optional[str]) -> List[Tuple[str, float]]:
+    items: List[Tuple[str, float]] = []
+    for part in (header or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, params = part.partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        items.append((name.strip().lower(), q))
+    return items
+
+
+def choose_media_type(accept: Optional[str]) -> str:
+    if msgpack is None:
+        return JSON_MEDIA_TYPE
+    best, best_q = JSON_MEDIA_TYPE, 0.0
+    for name, q in _parse_accept(accept):
+        if q <= 0:
+            continue
+        if name in MSGPACK_MEDIA_TYPES and q > best_q:
+            best, best_q = MSGPACK_MEDIA_TYPE, q
+        elif name in (JSON_MEDIA_TYPE, "application/*", "*/*") and q > best_q:
+            best, best_q = JSON_MEDIA_TYPE, q
+    return best
+
+
+def choose_content_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    offered = {name: q for name, q in _parse_accept(accept_encoding)}
+    candidates = ["gzip"]
+    if brotli is not None:
+        candidates.insert(0, "br")  # eşit q değerinde brotli tercih edilir
+    best, best_q = None, 0.0
+    for name in candidates:
+        q = offered.get(name, offered.get("*", 0.0))
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+def _to_plain(payload: Any) -> Any:
+    # Pydantic modellerinde model_dump, jsonable_encoder'dan belirgin şekilde hızlı
+    if isinstance(payload, BaseModel):
+        return payload.model_dump(mode="json")
+    return jsonable_encoder(payload)
+
+
+def _intern_table(payload: Any) -> List[str]:
+    counts: Dict[str, int] = {}
+
+    def walk(node: Any) -> None:
+        if isinstance(node, str):
+            if len(node) >= INTERN_MIN_LEN:
+                counts[node] = counts.get(node, 0) + 1
+        elif isinstance(node, dict):
+            for k, v in node.items():
+                walk(k)
+                walk(v)
+        elif isinstance(node, list):
+            for v in node:
+                walk(v)
+
+    walk(payload)
+    # En sık geçenler küçük indeks alır -> daha kısa ext payload
+    repeated = [s for s, c in counts.items() if c > 1]
+    repeated.sort(key=lambda s: -counts[s])
+    return repeated
+
+
+def _index_bytes(index: int) -> bytes:
+    if index < 0x100:
+        return index.to_bytes(1, "big")
+    if index < 0x10000:
+        return index.to_bytes(2, "big")
+    return index.to_bytes(4, "big")
+
+
+def pack_interned(payload: Any) -> bytes:
+    if msgpack is None:
+        raise RuntimeError("msgpack kurulu degil")
+    payload = _to_plain(payload)
+    table = _intern_table(payload)
+    refs = {s: msgpack.ExtType(STRING_REF_EXT, _index_bytes(i)) for i, s in enumerate(table)}
+
+    def replace(node: Any) -> Any:
+        if isinstance(node, str):
+            return refs.get(node, node)
+        if isinstance(node, dict):
+            return {replace(k): replace(v) for k, v in node.items()}
+        if isinstance(node, list):
+            return [replace(v) for v in node]
+        return node
+
+    # Zarf: [sürüm, string tablosu, veri]
+    return msgpack.packb([1, table, replace(payload)], use_bin_type=True)
+
+
+def unpack_interned(data: bytes) -> Any:
+    if msgpack is None:
+        raise RuntimeError("msgpack kurulu degil")
+    version, table, body = msgpack.unpackb(
+        data,
+        raw=False,
+        strict_map_key=False,
+        ext_hook=lambda code, raw: msgpack.ExtType(code, raw),
+    )
+    if version != 1:
+        raise ValueError(f"Desteklenmeyen msgpack zarf surumu: {version}")
+
+    def restore(node: Any) -> Any:
+        if isinstance(node, msgpack.ExtType) and node.code == STRING_REF_EXT:
+            return table[int.from_bytes(node.data, "big")]
+        if isinstance(node, dict):
+            return {restore(k): restore(v) for k, v in node.items()}
+        if isinstance(node, list):
+            return [restore(v) for v in node]
+        return node
+
+    return restore(body)
+
+
+def encode_body(payload: Any, media_type: str) -> bytes:
+    if media_type == MSGPACK_MEDIA_TYPE:
+        return pack_interned(payload)
+    return json.dumps(
+        _to_plain(payload), ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def compress_body(body: bytes, encoding: Optional[str]) -> Tuple[bytes, Optional[str]]:
+    if encoding is None or len(body) < COMPRESS_MIN_BYTES:
+        return body, None
+    if encoding == "br" and brotli is not None:
+        return brotli.compress(body, quality=BROTLI_QUALITY), "br"
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=GZIP_LEVEL), "gzip"
+    return body, None
+
+
+def negotiated_response(request: Request, payload: Any) -> Response:
+    media_type = choose_media_type(request.headers.get("accept"))
+    with tracing.span("response.encode", media_type=media_type) as sp:
+        body = encode_body(payload, media_type)
+        raw_size = len(body)
+        body, content_encoding = compress_body(body, choose_content_encoding(request.headers.get("accept-encoding")))
+        if sp is not None:
+            sp.set("raw_bytes", raw_size)
+            sp.set("bytes", len(body))
+            sp.set("content_encoding", content_encoding)
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    if content_encoding:
+        headers["Content-Encoding"] = content_encoding
+    return Response(content=body, media_type=media_type, headers=headers)
@@ -4,37 +4,11 @@ from typing import Optional, List, Dict
 from fastapi import FastAPI, Body, HTTPException
 from pydantic import BaseModel, Field
 
+from app.catalogue import get_catalogue
+
 # Basit deterministik planlayici (LLM yoksa kullanilir)
 DAY_NAMES = ["Pazartesi","Salı","Çarşamba","Perşembe","Cuma","Cumartesi","Pazar"]
 
-RESOURCE_BANK = {
-    "turkce": {
-        "baslangic": ["Bilgi Sarmal", "Endemik"],
-        "orta": ["XRAY Türkçe Deneme"],
-        "ileri": ["ÜçDörtBeş Türkçe"],
-    },
-    "matematik": {
-        "baslangic": ["Toprak AYT Matematik Deneme (temel)"] ,
-        "orta": ["ÜçDörtBeş TYT Matematik Deneme", "Toprak AYT Matematik"],
-        "ileri": ["Apotemi AYT Matematik"],
-    },
-    "fizik": {
-        "baslangic": ["Bilgi Sarmal Fizik", "Esen TYT Fizik"],
-        "orta": ["Nihat Bilgin TYT-AYT Soru Bankası"],
-        "ileri": ["Ertan Sinan Şahin TYT-AYT Deneme"],
-    },
-    "kimya": {
-        "baslangic": ["Miray Yayınları"],
-        "orta": ["Paraf AYT Kimya"],
-        "ileri": ["Aydın Yayınları"],
-    },
-    "biyoloji": {
-        "baslangic": ["Palme TYT Biyoloji (kolay)"],
-        "orta": ["Palme Biyoloji"],
-        "ileri": ["Biyotik Yayınları"],
-    },
-}
-
 def get_day_type(index: int) -> str:
     return "TYT" if index % 2 == 0 else "AYT"
 
@@ -66,13 +40,8 @@ def build_deterministic_plan(level: str = "orta") -> Dict:
         else:
             dt = get_day_type(i)
             days.append({"day": day_name, "type": dt, "blocks": get_daily_blocks(dt)})
-    resources = {
-        "turkce": RESOURCE_BANK["turkce"].get(level, RESOURCE_BANK["turkce"]["orta"]),
-        "matematik": RESOURCE_BANK["matematik"].get(level, RESOURCE_BANK["matematik"]["orta"]),
-        "fizik": RESOURCE_BANK["fizik"].get(level, RESOURCE_BANK["fizik"]["orta"]),
-        "kimya": RESOURCE_BANK["kimya"].get(level, RESOURCE_BANK["kimya"]["orta"]),
-        "biyoloji": RESOURCE_BANK["biyoloji"].get(level, RESOURCE_BANK["biyoloji"]["orta"]),
-    }
+    bank = get_catalogue().resource_bank
+    resources = {subject: levels.get(level, levels["orta"]) for subject, levels in bank.items()}
     return {"meta": {"generated_at": datetime.utcnow().isoformat() + "Z"}, "days": days, "resources": resources}
 
 class GeneratePayload(BaseModel):
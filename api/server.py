@@ -1,11 +1,29 @@
-from fastapi import FastAPI, Body, Query
+import os
+from fastapi import FastAPI, Body, Header, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from app.models import UserInput, GeneratedPlan
-from app.scheduler import generate_plan, generate_simple_plan, generate_one_week_plan
+from fastapi.routing import APIRoute
+from app import tracing
+from app.catalogue import CatalogueError, PlanCache, get_catalogue, reload_catalogue
+from app.models import UserInput, GeneratedPlan, SweepRequest, SweepResult
+from app.scheduler import generate_plan, generate_simple_plan, generate_one_week_plan, sweep_allocations
+from api.encoding import negotiated_response
 from datetime import datetime
 from typing import Optional, Dict, Any
 
+class TracedRoute(APIRoute):
+    # Gövde okuma + doğrulama + endpoint + serileştirme tek span'de; alt span'ler farkı gösterir
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+        route_name = f"route {','.join(sorted(self.methods))} {self.path}"
+
+        async def traced_handler(request: Request):
+            with tracing.span(route_name):
+                return await handler(request)
+
+        return traced_handler
+
 app = FastAPI(title="YKS Plan API")
+app.router.route_class = TracedRoute
 
 allowed_origins = [
     "http://localhost:3000",
@@ -24,51 +42,70 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# UI'dan gelen traceparent devralınır; yoksa YKS_TRACE_SAMPLE_RATE ile örneklenir
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    with tracing.start_trace(
+        f"http {request.method} {request.url.path}",
+        traceparent=request.headers.get(tracing.TRACEPARENT_HEADER),
+    ) as root:
+        response = await call_next(request)
+        if root is not None:
+            root.set("status_code", response.status_code)
+        return response
+
+plan_cache = PlanCache()
+
 @app.get("/health")
 async def health():
-    return {"status": "ok"}
-
+    return {"status": "ok", "catalogue_version": get_catalogue().version}
+
+# Katalog dosyaları değişince otomatik yüklenir; bu endpoint beklemeden zorlar
+@app.post("/admin/catalogue/reload")
+async def admin_reload_catalogue(x_admin_token: Optional[str] = Header(default=None)):
+    expected = os.getenv("ADMIN_TOKEN")
+    if not expected or x_admin_token != expected:
+        raise HTTPException(status_code=403, detail="Yetkisiz")
+    previous = get_catalogue().version
+    try:
+        catalogue = reload_catalogue()
+    except CatalogueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    return {"version": catalogue.version, "previous_version": previous, "changed": catalogue.version != previous}
+
+def _cached_plan(kind: str, payload, build):
+    # İstek boyunca tek katalog görüntüsü; cache anahtarı katalog sürümüne bağlı
+    catalogue = get_catalogue()
+    key = (kind, payload.model_dump_json())
+    with tracing.span("plan.build", kind=kind, catalogue_version=catalogue.version) as sp:
+        plan = plan_cache.get(catalogue.version, key)
+        if sp is not None:
+            sp.set("cache_hit", plan is not None)
+        if plan is None:
+            plan = build(payload, catalogue=catalogue)
+            # Kilit dışında okunur; bu arada katalog değiştiyse eski sürümün sonucu yazılmaz
+            plan_cache.put(catalogue.version, key, plan, current_version=get_catalogue().version)
+    return plan
+
+# Plan endpoint'leri Accept / Accept-Encoding'e göre JSON veya msgpack, gzip veya br döner
 @app.post("/plan", response_model=GeneratedPlan)
-async def create_plan(payload: UserInput):
-    return generate_plan(payload)
+async def create_plan(payload: UserInput, request: Request):
+    return negotiated_response(request, _cached_plan("plan", payload, generate_plan))
 
 @app.post("/plan/simple")
-async def create_simple_plan(payload: UserInput):
-    return generate_simple_plan(payload)
+async def create_simple_plan(payload: UserInput, request: Request):
+    return negotiated_response(request, _cached_plan("simple", payload, generate_simple_plan))
 
 @app.post("/plan/one-week")
-async def create_one_week_plan(payload: UserInput):
-    return generate_one_week_plan(payload)
+async def create_one_week_plan(payload: UserInput, request: Request):
+    return negotiated_response(request, _cached_plan("one-week", payload, generate_one_week_plan))
 
-# === React uyumlu endpoint ===
-RESOURCE_BANK = {
-    "turkce": {
-        "baslangic": ["Bilgi Sarmal", "Endemik"],
-        "orta": ["XRAY Türkçe Deneme"],
-        "ileri": ["ÜçDörtBeş Türkçe"],
-    },
-    "matematik": {
-        "baslangic": ["Toprak AYT Matematik Deneme (temel)"],
-        "orta": ["ÜçDörtBeş TYT Matematik Deneme", "Toprak AYT Matematik"],
-        "ileri": ["Apotemi AYT Matematik"],
-    },
-    "fizik": {
-        "baslangic": ["Bilgi Sarmal Fizik", "Esen TYT Fizik"],
-        "orta": ["Nihat Bilgin TYT-AYT Soru Bankası"],
-        "ileri": ["Ertan Sinan Şahin TYT-AYT Deneme"],
-    },
-    "kimya": {
-        "baslangic": ["Miray Yayınları"],
-        "orta": ["Paraf AYT Kimya"],
-        "ileri": ["Aydın Yayınları"],
-    },
-    "biyoloji": {
-        "baslangic": ["Palme TYT Biyoloji (kolay)"],
-        "orta": ["Palme Biyoloji"],
-        "ileri": ["Biyotik Yayınları"],
-    },
-}
+# Saat / hafta slider'ları için tüm ızgara tek yanıtta; UI sürükleme sırasında API'ye gitmez
+@app.post("/plan/sweep", response_model=SweepResult)
+async def create_plan_sweep(payload: SweepRequest, request: Request):
+    return negotiated_response(request, _cached_plan("sweep", payload, sweep_allocations))
 
+# === React uyumlu endpoint ===
 DAY_NAMES = ["Pazartesi", "Salı", "Çarşamba", "Perşembe", "Cuma", "Cumartesi", "Pazar"]
 
 def _get_day_type(index: int) -> str:
@@ -88,6 +125,7 @@ def _get_daily_blocks(day_type: str):
 @app.post("/react/plan")
 async def react_plan(body: Optional[Dict[str, Any]] = Body(default=None), level: Optional[str] = Query(default=None)):
     lvl = level or (body or {}).get("level") or "orta"
+    bank = get_catalogue().resource_bank
 
     days = []
     for i, name in enumerate(DAY_NAMES):
@@ -106,13 +144,7 @@ async def react_plan(body: Optional[Dict[str, Any]] = Body(default=None), level:
             day_type = _get_day_type(i)
             days.append({"day": name, "type": day_type, "blocks": _get_daily_blocks(day_type)})
 
-    resources = {
-        "turkce": RESOURCE_BANK["turkce"].get(lvl, RESOURCE_BANK["turkce"]["orta"]),
-        "matematik": RESOURCE_BANK["matematik"].get(lvl, RESOURCE_BANK["matematik"]["orta"]),
-        "fizik": RESOURCE_BANK["fizik"].get(lvl, RESOURCE_BANK["fizik"]["orta"]),
-        "kimya": RESOURCE_BANK["kimya"].get(lvl, RESOURCE_BANK["kimya"]["orta"]),
-        "biyoloji": RESOURCE_BANK["biyoloji"].get(lvl, RESOURCE_BANK["biyoloji"]["orta"]),
-    }
+    resources = {subject: levels.get(lvl, levels["orta"]) for subject, levels in bank.items()}
 
     return {
         "ok": True,
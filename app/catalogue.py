@@ -0,0 +1,222 @@
+from __future__ import annotations
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pydantic import ValidationError
+from .models import Catalogue
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+
+os.makedirs(DATA_DIR, exist_ok=True)
+
+# Dosya yoksa bu varsayılanlar diske yazılır (ilk kurulum)
+DEFAULT_TOPICS = {
+    "Türkçe": ["Sözcükte Anlam", "Cümlede Anlam", "Paragraf", "Dil Bilgisi", "Yazım-Noktalama"],
+    "Sosyal": ["Tarih Temel", "Coğrafya Temel", "Felsefe", "Din Kültürü"],
+    "Matematik": ["Temel Kavramlar", "Sayılar", "Bölünebilme", "OBEB-OKEK", "Rasyonel Sayılar", "Denklemler", "Mutlak Değer", "Üslü Sayılar", "Köklü Sayılar", "Oran-Orantı", "Problemler"],
+    "Geometri": ["Açı-Kenar", "Üçgenler", "Dörtgenler", "Çokgenler", "Çember-Daire", "Katı Cisimler"],
+    "Fizik": ["Fizik Bilimine Giriş", "Madde ve Özellikleri", "Hareket ve Kuvvet", "Enerji", "Elektrik ve Manyetizma"],
+    "Kimya": ["Atom ve Periyodik Sistem", "Kimyasal Türler Arası Etkileşimler", "Kimyasal Hesaplamalar", "Asit-Baz-Tuz", "Karışımlar"],
+    "Biyoloji": ["Canlıların Yapısı", "Hücre", "Canlıların Sınıflandırılması", "İnsan Fizyolojisi", "Ekosistem"],
+    "Yabancı Dil": ["Vocabulary", "Grammar", "Reading", "Use of English", "Listening"],
+}
+
+DEFAULT_RESOURCES = {
+    "Matematik": [
+        {"type": "book", "title": "TYT Matematik Soru Bankası", "provider": "Karekök", "tags": ["sayisal", "ea"]},
+        {"type": "video", "title": "Hocalara Geldik - TYT Matematik", "provider": "YouTube", "url": "https://www.youtube.com/@hocalarageldik", "tags": ["sayisal", "ea"]},
+        {"type": "web", "title": "Khan Academy Türkçe - Matematik", "provider": "Khan Academy", "url": "https://tr.khanacademy.org", "tags": ["sayisal", "ea"]}
+    ],
+    "Geometri": [
+        {"type": "book", "title": "AYT Geometri Soru Bankası", "provider": "Apotemi", "tags": ["sayisal", "ea"]},
+        {"type": "video", "title": "Tonguç Geometri", "provider": "YouTube", "url": "https://www.youtube.com/@tongucakademi", "tags": ["sayisal", "ea"]}
+    ],
+    "Fizik": [
+        {"type": "book", "title": "AYT Fizik Soru Bankası", "provider": "Aydın", "tags": ["sayisal"]},
+        {"type": "video", "title": "Parafizik", "provider": "YouTube", "url": "https://www.youtube.com/@parafizik", "tags": ["sayisal"]}
+    ],
+    "Kimya": [
+        {"type": "book", "title": "AYT Kimya Soru Bankası", "provider": "Endemik", "tags": ["sayisal"]},
+        {"type": "video", "title": "Kimya Adası", "provider": "YouTube", "url": "https://www.youtube.com/@kimyaadasi", "tags": ["sayisal"]}
+    ],
+    "Biyoloji": [
+        {"type": "book", "title": "AYT Biyoloji Soru Bankası", "provider": "Bilgi Sarmal", "tags": ["sayisal"]},
+        {"type": "video", "title": "BiyolojiGUN", "provider": "YouTube", "url": "https://www.youtube.com/@BiyolojiGUN", "tags": ["sayisal"]}
+    ],
+    "Türkçe": [
+        {"type": "book", "title": "TYT Türkçe Paragraf", "provider": "Paraf", "tags": ["sayisal", "ea", "sozel", "dil"]},
+        {"type": "video", "title": "Paragrafiks", "provider": "YouTube", "url": "https://www.youtube.com/@paragrafiks", "tags": ["sayisal", "ea", "sozel", "dil"]}
+    ],
+    "Sosyal": [
+        {"type": "book", "title": "TYT Sosyal Bilimler Soru Bankası", "provider": "Bilgi Sarmal", "tags": ["ea", "sozel"]},
+        {"type": "video", "title": "Hocalara Geldik - TYT Sosyal", "provider": "YouTube", "url": "https://www.youtube.com/@hocalarageldik", "tags": ["ea", "sozel"]}
+    ],
+    "Yabancı Dil": [
+        {"type": "book", "title": "YDT Vocabulary", "provider": "Modadil", "tags": ["dil"]},
+        {"type": "web", "title": "Cambridge English Practice", "provider": "Cambridge", "url": "https://www.cambridgeenglish.org", "tags": ["dil"]}
+    ]
+}
+
+DEFAULT_TRACK_WEIGHTS = {
+    "sayisal": {"Matematik": 1.0, "Geometri": 0.8, "Fizik": 1.0, "Kimya": 0.9, "Biyoloji": 0.9, "Türkçe": 0.6, "Sosyal": 0.4, "Yabancı Dil": 0.3},
+    "ea": {"Matematik": 1.0, "Geometri": 0.9, "Türkçe": 0.9, "Sosyal": 0.8, "Fizik": 0.4, "Kimya": 0.4, "Biyoloji": 0.4, "Yabancı Dil": 0.3},
+    "sozel": {"Türkçe": 1.0, "Sosyal": 1.0, "Matematik": 0.5, "Geometri": 0.5, "Yabancı Dil": 0.4, "Fizik": 0.2, "Kimya": 0.2, "Biyoloji": 0.2},
+    "dil": {"Yabancı Dil": 1.0, "Türkçe": 0.7, "Sosyal": 0.5, "Matematik": 0.4, "Geometri": 0.4, "Fizik": 0.2, "Kimya": 0.2, "Biyoloji": 0.2},
+}
+
+DEFAULT_RESOURCE_BANK = {
+    "turkce": {"baslangic": ["Bilgi Sarmal", "Endemik"], "orta": ["XRAY Türkçe Deneme"], "ileri": ["ÜçDörtBeş Türkçe"]},
+    "matematik": {"baslangic": ["Toprak AYT Matematik Deneme (temel)"], "orta": ["ÜçDörtBeş TYT Matematik Deneme", "Toprak AYT Matematik"], "ileri": ["Apotemi AYT Matematik"]},
+    "fizik": {"baslangic": ["Bilgi Sarmal Fizik", "Esen TYT Fizik"], "orta": ["Nihat Bilgin TYT-AYT Soru Bankası"], "ileri": ["Ertan Sinan Şahin TYT-AYT Deneme"]},
+    "kimya": {"baslangic": ["Miray Yayınları"], "orta": ["Paraf AYT Kimya"], "ileri": ["Aydın Yayınları"]},
+    "biyoloji": {"baslangic": ["Palme TYT Biyoloji (kolay)"], "orta": ["Palme Biyoloji"], "ileri": ["Biyotik Yayınları"]},
+}
+
+# Catalogue alanı -> (dosya adı, varsayılan)
+CATALOGUE_FILES = {
+    "topics": ("yks_topics.json", DEFAULT_TOPICS),
+    "resources": ("resources.json", DEFAULT_RESOURCES),
+    "track_weights": ("track_weights.json", DEFAULT_TRACK_WEIGHTS),
+    "resource_bank": ("resource_bank.json", DEFAULT_RESOURCE_BANK),
+}
+
+
+class CatalogueError(Exception):
+    pass
+
+
+def _load_json(path: str, fallback: Optional[dict] = None) -> dict:
+    # fallback yalnızca ilk kurulumda verilir; yeniden yüklemede eksik dosya hata olmalı
+    if fallback is not None and not os.path.exists(path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(fallback, f, ensure_ascii=False, indent=2)
+        return fallback
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_catalogue(data_dir: str = DATA_DIR, create_missing: bool = False) -> Catalogue:
+    raw: Dict[str, Any] = {}
+    try:
+        for field, (file_name, fallback) in CATALOGUE_FILES.items():
+            raw[field] = _load_json(os.path.join(data_dir, file_name), fallback if create_missing else None)
+    except (OSError, ValueError) as exc:
+        raise CatalogueError(f"Katalog okunamadı: {exc}") from exc
+    # Sürüm = içerik özeti; yalnızca biçim değişikliği sürümü değiştirmez
+    digest = hashlib.sha256(json.dumps(raw, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+    try:
+        return Catalogue(version=digest.hexdigest()[:12], **raw)
+    except ValidationError as exc:
+        raise CatalogueError(f"Katalog geçersiz: {exc}") from exc
+
+
+class CatalogueStore:
+    def __init__(self, data_dir: str = DATA_DIR, check_interval: float = 2.0):
+        self.data_dir = data_dir
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._catalogue = load_catalogue(data_dir, create_missing=True)
+        self._stamp = self._file_stamp()
+        self._next_check = time.monotonic() + check_interval
+
+    def _file_stamp(self) -> Tuple[Tuple[int, int], ...]:
+        stamp = []
+        for file_name, _ in CATALOGUE_FILES.values():
+            try:
+                st = os.stat(os.path.join(self.data_dir, file_name))
+                stamp.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                stamp.append((0, 0))
+        return tuple(stamp)
+
+    def current(self) -> Catalogue:
+        # İstek başına tek okuma; dönen nesne istek boyunca değişmez
+        if self.check_interval >= 0 and time.monotonic() >= self._next_check:
+            self._check_for_changes()
+        return self._catalogue
+
+    def _check_for_changes(self) -> None:
+        if not self._lock.acquire(blocking=False):
+            return  # başka bir thread zaten kontrol ediyor
+        try:
+            self._next_check = time.monotonic() + self.check_interval
+            stamp = self._file_stamp()
+            if stamp == self._stamp:
+                return
+            try:
+                self._swap(load_catalogue(self.data_dir), stamp)
+            except CatalogueError as exc:
+                # Geçersiz içerik yayına alınmaz; eski anlık görüntü kullanılmaya devam eder
+                self._stamp = stamp
+                logger.warning("Katalog yeniden yüklenemedi, %s sürümünde kalınıyor: %s", self._catalogue.version, exc)
+        finally:
+            self._lock.release()
+
+    def _swap(self, catalogue: Catalogue, stamp: Tuple[Tuple[int, int], ...]) -> None:
+        self._stamp = stamp
+        if catalogue.version != self._catalogue.version:
+            logger.info("Katalog %s -> %s", self._catalogue.version, catalogue.version)
+            self._catalogue = catalogue
+
+    def reload(self) -> Catalogue:
+        # Admin çağrısı: hata çağırana iletilir, mevcut katalog korunur
+        with self._lock:
+            stamp = self._file_stamp()
+            self._swap(load_catalogue(self.data_dir), stamp)
+            self._next_check = time.monotonic() + self.check_interval
+            return self._catalogue
+
+
+class PlanCache:
+    # Katalog sürümüne bağlı LRU; sürüm değişince tüm girdiler düşürülür
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._version: Optional[str] = None
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+
+    def get(self, version: str, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            if version != self._version:
+                return None
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, version: str, key: Hashable, value: Any, current_version: Optional[str] = None) -> None:
+        # current_version çağıran tarafından kilit dışında okunur; burada katalog okunmaz
+        with self._lock:
+            if version != self._version:
+                # Eski anlık görüntüyle biten istekler yeni sürümün cache'ini silmesin
+                if current_version is not None and version != current_version:
+                    return
+                self._version = version
+                self._entries.clear()
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._version = None
+            self._entries.clear()
+
+
+_store = CatalogueStore(check_interval=float(os.getenv("YKS_CATALOGUE_CHECK_INTERVAL", "2.0")))
+
+
+def get_catalogue() -> Catalogue:
+    return _store.current()
+
+
+def reload_catalogue() -> Catalogue:
+    return _store.reload()
@@ -1,5 +1,5 @@
-from typing import Dict, List, Literal, Optional
-from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Literal, Optional, get_args
+from pydantic import BaseModel, ConfigDict, Field, model_validator
 
 Track = Literal["sayisal", "ea", "sozel", "dil"]
 
@@ -32,3 +32,65 @@ class GeneratedPlan(BaseModel):
     user: UserInput
     weeks: List[WeeklyPlan]
     resource_suggestions: Dict[str, List[ResourceItem]]
+
+class SweepRange(BaseModel):
+    min: int = Field(ge=1)
+    max: int = Field(ge=1)
+    step: int = Field(default=1, ge=1)
+
+    @model_validator(mode="after")
+    def _check_order(self) -> "SweepRange":
+        if self.max < self.min:
+            raise ValueError("max, min'den küçük olamaz")
+        return self
+
+    def values(self) -> List[int]:
+        return list(range(self.min, self.max + 1, self.step))
+
+class SweepRequest(BaseModel):
+    user: UserInput
+    hours_per_week: SweepRange = Field(default_factory=lambda: SweepRange(min=5, max=60, step=1))
+    weeks_left: SweepRange = Field(default_factory=lambda: SweepRange(min=1, max=60, step=1))
+
+    @model_validator(mode="after")
+    def _check_bounds(self) -> "SweepRequest":
+        # UserInput ile aynı sınırlar; ızgara en fazla 80 x 60 hücre
+        if self.hours_per_week.max > 80:
+            raise ValueError("hours_per_week.max en fazla 80 olabilir")
+        if self.weeks_left.max > 60:
+            raise ValueError("weeks_left.max en fazla 60 olabilir")
+        return self
+
+class SweepResult(BaseModel):
+    # Matrisler [hours_per_week indeksi][subjects indeksi] şeklindedir.
+    # Haftalık dağılım weeks_left'e bağlı olmadığından ızgara hafta ekseninde tekrarlanmaz;
+    # toplam saat = weekly_hours * weeks_left.
+    catalogue_version: str
+    subjects: List[str]
+    hours_per_week: List[int]
+    weeks_left: List[int]
+    weekly_hours: List[List[float]]
+    topics_per_week: List[List[int]]
+
+class Catalogue(BaseModel):
+    # Diskten yüklenen içerik anlık görüntüsü; değiştirilemez, yeniden yüklemede komple yenisiyle değişir
+    model_config = ConfigDict(frozen=True)
+
+    version: str
+    topics: Dict[str, List[str]]
+    resources: Dict[str, List[Dict[str, Any]]]
+    track_weights: Dict[Track, Dict[str, float]]
+    resource_bank: Dict[str, Dict[str, List[str]]]
+
+    @model_validator(mode="after")
+    def _check_consistency(self) -> "Catalogue":
+        missing = set(get_args(Track)) - set(self.track_weights)
+        if missing:
+            raise ValueError(f"track_weights eksik alanlar: {sorted(missing)}")
+        for track, weights in self.track_weights.items():
+            if not weights or any(w < 0 for w in weights.values()):
+                raise ValueError(f"track_weights[{track}] boş veya negatif ağırlık içeriyor")
+        for subject, levels in self.resource_bank.items():
+            if "orta" not in levels:
+                raise ValueError(f"resource_bank[{subject}] için 'orta' seviyesi yok")
+        return self
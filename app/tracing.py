@@ -0,0 +1,211 @@
+# Hafif, süreç-içi izleme (tracing)
+# UI -> API -> scheduler zincirinde sürenin nereye gittiğini görmek için span'ler toplar.
+# Örnekleme kapalıyken (varsayılan) her çağrının maliyeti tek bir ContextVar okumasıdır.
+#
+# Ortam değişkenleri:
+#   YKS_TRACE_SAMPLE_RATE  0.0-1.0 arası, yeni trace'lerin örneklenme oranı (varsayılan 0)
+#   YKS_TRACE_TRUST_PARENT 1 ise gelen traceparent'ın örnekleme bayrağına uyulur (yalnızca
+#                          güvenilen istemciler için; oran 0 iken yine de hiçbir şey kaydedilmez)
+#   YKS_TRACE_FILE         verilirse span'ler bu dosyaya JSON satırı olarak eklenir,
+#                          verilmezse bellekteki halka tampona yazılır
+from __future__ import annotations
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from functools import wraps
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, TextIO, TypeVar
+import json
+import os
+import random
+import threading
+import time
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+TRACEPARENT_HEADER = "traceparent"
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str] = None
+    start: float = 0.0
+    duration_ms: float = 0.0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+    def set(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+
+class InMemoryExporter:
+    def __init__(self, max_spans: int = 10_000):
+        self._spans: Deque[Span] = deque(maxlen=max_spans)
+        self._lock = threading.Lock()
+
+    def export(self, spans: List[Span]) -> None:
+        with self._lock:
+            self._spans.extend(spans)
+
+    def spans(self, trace_id: Optional[str] = None) -> List[Span]:
+        with self._lock:
+            return [s for s in self._spans if trace_id is None or s.trace_id == trace_id]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._spans.clear()
+
+
+class FileExporter:
+    # Dosya bir kez açılır; her trace tek bir write ile eklenir
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file: Optional[TextIO] = None
+
+    def export(self, spans: List[Span]) -> None:
+        lines = "".join(json.dumps(asdict(s), ensure_ascii=False, default=str) + "\n" for s in spans)
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(lines)
+            self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+_sample_rate = float(os.getenv("YKS_TRACE_SAMPLE_RATE", "0") or 0)
+_trust_parent = os.getenv("YKS_TRACE_TRUST_PARENT", "0") == "1"
+_exporter: Any = FileExporter(os.environ["YKS_TRACE_FILE"]) if os.getenv("YKS_TRACE_FILE") else InMemoryExporter()
+# Yalnızca örneklenen trace'lerde dolu; None ise tüm span çağrıları no-op
+_current: ContextVar[Optional[Span]] = ContextVar("yks_current_span", default=None)
+# Biten span'ler kök span kapanana kadar burada birikir; exporter trace başına bir kez çağrılır
+_finished: ContextVar[Optional[List[Span]]] = ContextVar("yks_finished_spans", default=None)
+
+
+def configure(sample_rate: Optional[float] = None, exporter: Any = None, trust_parent: Optional[bool] = None) -> None:
+    global _sample_rate, _exporter, _trust_parent
+    if sample_rate is not None:
+        _sample_rate = max(0.0, min(1.0, sample_rate))
+    if trust_parent is not None:
+        _trust_parent = trust_parent
+    if exporter is not None:
+        _exporter = exporter
+
+
+def get_exporter() -> Any:
+    return _exporter
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+def _parse_traceparent(value: Optional[str]):
+    # W3C trace-context: 00-<trace_id 32>-<parent_id 16>-<flags 2>
+    if not value:
+        return None
+    parts = value.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        sampled = int(parts[3], 16) & 0x01
+    except ValueError:
+        return None
+    return parts[1], parts[2], bool(sampled)
+
+
+def _run_span(span: Span) -> Iterator[Span]:
+    token = _current.set(span)
+    start = time.perf_counter()
+    try:
+        yield span
+    except BaseException as exc:
+        span.set("error", f"{type(exc).__name__}: {exc}")
+        raise
+    finally:
+        span.duration_ms = (time.perf_counter() - start) * 1000.0
+        _current.reset(token)
+        finished = _finished.get()
+        if finished is not None:
+            finished.append(span)
+
+
+@contextmanager
+def start_trace(name: str, traceparent: Optional[str] = None, **attributes: Any) -> Iterator[Optional[Span]]:
+    # Oran 0 ise izleme tamamen kapalı: dışarıdan gelen başlık bunu açamaz
+    if _sample_rate <= 0:
+        yield None
+        return
+    parent = _parse_traceparent(traceparent)
+    trace_id, parent_id = (parent[0], parent[1]) if parent is not None else (None, None)
+    # Üst trace'in kararına yalnızca güvenilen kurulumda uyulur; aksi halde yerel örneklenir
+    if parent is not None and _trust_parent:
+        sampled = parent[2]
+    else:
+        sampled = random.random() < _sample_rate
+    if not sampled:
+        yield None
+        return
+    span = Span(
+        name=name,
+        trace_id=trace_id or f"{random.getrandbits(128):032x}",
+        span_id=f"{random.getrandbits(64):016x}",
+        parent_id=parent_id,
+        start=time.time(),
+        attributes=dict(attributes),
+    )
+    finished: List[Span] = []
+    token = _finished.set(finished)
+    try:
+        yield from _run_span(span)
+    finally:
+        _finished.reset(token)
+        _exporter.export(finished)
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    parent = _current.get()
+    if parent is None:
+        yield None
+        return
+    child = Span(
+        name=name,
+        trace_id=parent.trace_id,
+        span_id=f"{random.getrandbits(64):016x}",
+        parent_id=parent.span_id,
+        start=time.time(),
+        attributes=dict(attributes),
+    )
+    yield from _run_span(child)
+
+
+def traced(name: Optional[str] = None) -> Callable[[F], F]:
+    def decorator(fn: F) -> F:
+        span_name = name or f"{fn.__module__}.{fn.__qualname__}"
+
+        @wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if _current.get() is None:
+                return fn(*args, **kwargs)
+            with span(span_name):
+                return fn(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def inject_headers(headers: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    headers = dict(headers or {})
+    current = _current.get()
+    if current is not None:
+        headers[TRACEPARENT_HEADER] = f"00-{current.trace_id}-{current.span_id}-01"
+    return headers
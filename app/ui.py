@@ -2,8 +2,9 @@ import json
 import streamlit as st
 from typing import Dict
 import requests
-from app.models import UserInput
-from app.scheduler import generate_plan, generate_simple_plan, generate_one_week_plan
+from app import tracing
+from app.models import SweepRange, SweepRequest, UserInput
+from app.scheduler import generate_plan, generate_simple_plan, generate_one_week_plan, sweep_allocations
 
 st.set_page_config(page_title="YKS AI Planlayıcı", page_icon="🧠", layout="wide")
 
@@ -20,15 +21,23 @@ st.markdown("""
 
 st.title("🧠 AI Destekli YKS Çalışma Planlayıcı")
 
+# Slider aralıkları; önizleme ızgarası bu aralık için tek istekte alınır
+SWEEP_HOURS = (1, 80)
+SWEEP_WEEKS = (1, 60)
+# Izgara ilk çizimde istenir; API yavaşsa sayfa beklemeden yerel hesaba düşer
+SWEEP_TIMEOUT_SECONDS = 2
+SWEEP_CACHE_TTL_SECONDS = 60
+
 with st.sidebar:
     st.header("Bilgilerini Gir")
     name = st.text_input("Adın", value="")
     track = st.selectbox("Alanın", options=["sayisal", "ea", "sozel", "dil"], index=0)
     general_level = st.slider("Genel Seviyen (1=Başlangıç, 5=İleri)", min_value=1, max_value=5, value=3)
     
+    weeks_left = st.slider("Kalan Hafta", min_value=SWEEP_WEEKS[0], max_value=SWEEP_WEEKS[1], value=12)
+    hours_per_week = st.slider("Haftalık Çalışma Saati", min_value=SWEEP_HOURS[0], max_value=SWEEP_HOURS[1], value=20)
+
     # Varsayılanlar
-    weeks_left = 12
-    hours_per_week = 20
     default_levels: Dict[str, int] = {
         "Türkçe": 3,
         "Sosyal": 3,
@@ -48,7 +57,10 @@ API_BASE = os.getenv("API_BASE", "https://your-backend-url.railway.app")
 
 def fetch_simple_plan_via_api(user: UserInput) -> Dict:
     try:
-        resp = requests.post(f"{API_BASE}/plan/simple", json=user.model_dump())
+        with tracing.span("ui.http POST /plan/simple") as sp:
+            resp = requests.post(f"{API_BASE}/plan/simple", json=user.model_dump(), headers=tracing.inject_headers())
+            if sp is not None:
+                sp.set("status_code", resp.status_code)
         if resp.ok:
             return resp.json()
     except Exception:
@@ -58,13 +70,71 @@ def fetch_simple_plan_via_api(user: UserInput) -> Dict:
 
 def fetch_one_week_plan_via_api(user: UserInput) -> Dict:
     try:
-        resp = requests.post(f"{API_BASE}/plan/one-week", json=user.model_dump())
+        with tracing.span("ui.http POST /plan/one-week") as sp:
+            resp = requests.post(f"{API_BASE}/plan/one-week", json=user.model_dump(), headers=tracing.inject_headers())
+            if sp is not None:
+                sp.set("status_code", resp.status_code)
         if resp.ok:
             return resp.json()
     except Exception:
         pass
     return generate_one_week_plan(user)
 
+def _sweep_request(track: str, general_level: int) -> SweepRequest:
+    return SweepRequest(
+        user=UserInput(
+            track=track,
+            weeks_left=SWEEP_WEEKS[0],
+            hours_per_week=SWEEP_HOURS[0],
+            subject_levels={subj: general_level for subj in default_levels.keys()},
+        ),
+        hours_per_week=SweepRange(min=SWEEP_HOURS[0], max=SWEEP_HOURS[1]),
+        weeks_left=SweepRange(min=SWEEP_WEEKS[0], max=SWEEP_WEEKS[1]),
+    )
+
+# Izgara yalnızca alan / seviye değişince yeniden alınır; slider sürüklemek istek atmaz.
+# Katalog güncellemesi en geç SWEEP_CACHE_TTL_SECONDS sonra görünür; hata durumunda
+# istisna fırlatıldığı için yerel hesap cache'e yazılmaz, API dönünce tekrar denenir.
+@st.cache_data(show_spinner=False, ttl=SWEEP_CACHE_TTL_SECONDS)
+def _fetch_sweep_from_api(track: str, general_level: int) -> Dict:
+    request = _sweep_request(track, general_level)
+    with tracing.start_trace("ui.sweep", track=track):
+        with tracing.span("ui.http POST /plan/sweep") as sp:
+            resp = requests.post(
+                f"{API_BASE}/plan/sweep",
+                json=request.model_dump(),
+                headers=tracing.inject_headers(),
+                timeout=SWEEP_TIMEOUT_SECONDS,
+            )
+            if sp is not None:
+                sp.set("status_code", resp.status_code)
+    resp.raise_for_status()
+    return resp.json()
+
+def fetch_sweep_via_api(track: str, general_level: int) -> Dict:
+    try:
+        return _fetch_sweep_from_api(track, general_level)
+    except Exception:
+        return sweep_allocations(_sweep_request(track, general_level)).model_dump()
+
+sweep = fetch_sweep_via_api(track, general_level)
+h_idx = sweep["hours_per_week"].index(hours_per_week)
+st.subheader("Haftalık Dağılım Önizlemesi")
+st.caption(f"{hours_per_week} saat/hafta × {weeks_left} hafta = toplam {hours_per_week * weeks_left} saat")
+st.dataframe(
+    [
+        {
+            "Ders": subject,
+            "Saat/Hafta": sweep["weekly_hours"][h_idx][s_idx],
+            "Konu/Hafta": sweep["topics_per_week"][h_idx][s_idx],
+            "Toplam Saat": round(sweep["weekly_hours"][h_idx][s_idx] * weeks_left, 1),
+        }
+        for s_idx, subject in enumerate(sweep["subjects"])
+    ],
+    use_container_width=True,
+    hide_index=True,
+)
+
 if st.button("Plan Oluştur", use_container_width=True):
     user = UserInput(
         name=name,
@@ -74,7 +144,9 @@ if st.button("Plan Oluştur", use_container_width=True):
         subject_levels=subject_levels,
         include_ayt=include_ayt,
     )
-    one_week = fetch_one_week_plan_via_api(user)
+    # Her tıklama ayrı bir trace; traceparent ile API tarafındaki span'lere bağlanır
+    with tracing.start_trace("ui.plan_olustur", track=track):
+        one_week = fetch_one_week_plan_via_api(user)
 
     st.success("Plan hazırlandı! Aşağıdan haftalık detayları ve kaynakları görebilirsin.")
 
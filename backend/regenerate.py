@@ -0,0 +1,397 @@
+# Kayıtlı tüm planların toplu yeniden üretimi (katalog / ağırlık değişikliğinden sonra)
+# SQLite kuyruğu gerçek bir broker yerine geçer; kullanıcılar shard'lara bölünür,
+# her shard ayrı bir process'te batch batch işlenir. Her batch tek transaction'da
+# yazılır, bu yüzden çökmeden sonra "run" kaldığı batch'ten devam eder.
+#
+# çalıştırma:
+#   python -m backend.regenerate enqueue --batch-size 200 --shards 4
+#   python -m backend.regenerate run --workers 4
+#   python -m backend.regenerate status
+from __future__ import annotations
+from typing import Dict, List, Optional
+import argparse
+import json
+import multiprocessing
+import os
+import sqlite3
+import sys
+import time
+import zlib
+from app.catalogue import get_catalogue
+from app.models import UserInput
+from app.scheduler import generate_plan
+
+DEFAULT_DB_PATH = os.getenv("YKS_PLAN_DB", os.path.join(os.path.dirname(__file__), "plans.sqlite3"))
+MAX_ATTEMPTS = 3
+# Worker, katalog sürümü işin sürümüyle uyuşmazsa bu kodla çıkar
+EXIT_CATALOGUE_MISMATCH = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    user_id TEXT PRIMARY KEY,
+    input_json TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS plans (
+    user_id TEXT PRIMARY KEY,
+    catalogue_version TEXT NOT NULL,
+    plan_json TEXT NOT NULL,
+    generated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    catalogue_version TEXT NOT NULL,
+    shards INTEGER NOT NULL,
+    total_users INTEGER NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS job_batches (
+    job_id INTEGER NOT NULL,
+    batch_no INTEGER NOT NULL,
+    shard INTEGER NOT NULL,
+    user_ids TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker_pid INTEGER,
+    error TEXT,
+    updated_at REAL,
+    PRIMARY KEY (job_id, batch_no)
+);
+CREATE TABLE IF NOT EXISTS job_user_errors (
+    job_id INTEGER NOT NULL,
+    user_id TEXT NOT NULL,
+    batch_no INTEGER NOT NULL,
+    error TEXT NOT NULL,
+    PRIMARY KEY (job_id, user_id)
+);
+CREATE INDEX IF NOT EXISTS idx_job_batches_claim ON job_batches (job_id, shard, status);
+"""
+
+
+class CatalogueMismatch(Exception):
+    pass
+
+
+def connect(db_path: str = DEFAULT_DB_PATH) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def save_user(conn: sqlite3.Connection, user_id: str, user: UserInput) -> None:
+    conn.execute(
+        "INSERT INTO users (user_id, input_json) VALUES (?, ?) "
+        "ON CONFLICT(user_id) DO UPDATE SET input_json = excluded.input_json",
+        (user_id, user.model_dump_json()),
+    )
+
+
+def shard_of(user_id: str, shards: int) -> int:
+    # hash() process'ler arası sabit değil; crc32 her çalıştırmada aynı shard'ı verir
+    return zlib.crc32(user_id.encode("utf-8")) % shards
+
+
+def enqueue(conn: sqlite3.Connection, batch_size: int = 200, shards: int = 4) -> int:
+    if batch_size < 1 or shards < 1:
+        raise ValueError("batch_size ve shards en az 1 olmalı")
+    user_ids = [row[0] for row in conn.execute("SELECT user_id FROM users ORDER BY user_id")]
+    by_shard: Dict[int, List[str]] = {i: [] for i in range(shards)}
+    for user_id in user_ids:
+        by_shard[shard_of(user_id, shards)].append(user_id)
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        cur = conn.execute(
+            "INSERT INTO jobs (catalogue_version, shards, total_users, created_at) VALUES (?, ?, ?, ?)",
+            (get_catalogue().version, shards, len(user_ids), time.time()),
+        )
+        job_id = cur.lastrowid
+        batch_no = 0
+        for shard, ids in by_shard.items():
+            for start in range(0, len(ids), batch_size):
+                chunk = ids[start:start + batch_size]
+                conn.execute(
+                    "INSERT INTO job_batches (job_id, batch_no, shard, user_ids, size) VALUES (?, ?, ?, ?, ?)",
+                    (job_id, batch_no, shard, json.dumps(chunk), len(chunk)),
+                )
+                batch_no += 1
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return job_id
+
+
+def latest_unfinished_job(conn: sqlite3.Connection) -> Optional[int]:
+    row = conn.execute(
+        "SELECT MAX(job_id) FROM job_batches WHERE status IN ('pending', 'running')"
+    ).fetchone()
+    return row[0]
+
+
+def job_progress(conn: sqlite3.Connection, job_id: int) -> Dict[str, int]:
+    progress = {"pending": 0, "running": 0, "done": 0, "failed": 0}
+    for status, users in conn.execute(
+        "SELECT status, SUM(size) FROM job_batches WHERE job_id = ? GROUP BY status", (job_id,)
+    ):
+        progress[status] = users
+    progress["total"] = sum(progress.values())
+    # Batch tamamlansa da planı üretilemeyen kullanıcılar
+    progress["user_errors"] = conn.execute(
+        "SELECT COUNT(*) FROM job_user_errors WHERE job_id = ?", (job_id,)
+    ).fetchone()[0]
+    return progress
+
+
+def job_catalogue_version(conn: sqlite3.Connection, job_id: int) -> Optional[str]:
+    row = conn.execute("SELECT catalogue_version FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+    return row[0] if row else None
+
+
+def check_catalogue(conn: sqlite3.Connection, job_id: int, catalogue=None) -> None:
+    # Bir işin tüm planları tek katalog sürümüyle üretilir; sürüm değiştiyse iş yeniden kuyruğa alınmalı
+    catalogue = catalogue or get_catalogue()
+    expected = job_catalogue_version(conn, job_id)
+    if catalogue.version != expected:
+        raise CatalogueMismatch(
+            f"job {job_id} katalog {expected} için oluşturuldu, aktif katalog {catalogue.version}; "
+            "yeni iş için 'enqueue' çalıştırın"
+        )
+
+
+def _claim_batch(conn: sqlite3.Connection, job_id: int, shard: int):
+    conn.execute("BEGIN IMMEDIATE")
+    row = conn.execute(
+        "SELECT batch_no, user_ids FROM job_batches WHERE job_id = ? AND shard = ? AND status = 'pending' "
+        "ORDER BY batch_no LIMIT 1",
+        (job_id, shard),
+    ).fetchone()
+    if row is None:
+        conn.execute("COMMIT")
+        return None
+    conn.execute(
+        "UPDATE job_batches SET status = 'running', worker_pid = ?, attempts = attempts + 1, updated_at = ? "
+        "WHERE job_id = ? AND batch_no = ?",
+        (os.getpid(), time.time(), job_id, row[0]),
+    )
+    conn.execute("COMMIT")
+    return row[0], json.loads(row[1])
+
+
+def process_batch(conn: sqlite3.Connection, job_id: int, batch_no: int, user_ids: List[str], catalogue=None) -> None:
+    catalogue = catalogue or get_catalogue()
+    placeholders = ",".join("?" * len(user_ids))
+    inputs = dict(conn.execute(
+        f"SELECT user_id, input_json FROM users WHERE user_id IN ({placeholders})", user_ids
+    ).fetchall())
+    now = time.time()
+    rows = []
+    errors = []
+    # Tek bir bozuk kayıt batch'teki diğer kullanıcıları engellemesin
+    for user_id in user_ids:
+        raw = inputs.get(user_id)
+        if raw is None:
+            errors.append((job_id, user_id, batch_no, "KeyError: kullanıcı bulunamadı"))
+            continue
+        try:
+            plan = generate_plan(UserInput.model_validate_json(raw), catalogue=catalogue)
+        except Exception as exc:
+            errors.append((job_id, user_id, batch_no, f"{type(exc).__name__}: {exc}"))
+            continue
+        rows.append((user_id, catalogue.version, plan.model_dump_json(), now))
+    # Planlar, kullanıcı hataları ve checkpoint aynı transaction'da: ya hepsi yazılır ya hiçbiri
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.executemany(
+            "INSERT INTO plans (user_id, catalogue_version, plan_json, generated_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(user_id) DO UPDATE SET catalogue_version = excluded.catalogue_version, "
+            "plan_json = excluded.plan_json, generated_at = excluded.generated_at",
+            rows,
+        )
+        conn.execute("DELETE FROM job_user_errors WHERE job_id = ? AND batch_no = ?", (job_id, batch_no))
+        conn.executemany(
+            "INSERT INTO job_user_errors (job_id, user_id, batch_no, error) VALUES (?, ?, ?, ?)", errors
+        )
+        conn.execute(
+            "UPDATE job_batches SET status = 'done', error = ?, updated_at = ? WHERE job_id = ? AND batch_no = ?",
+            (f"{len(errors)} kullanıcı başarısız" if errors else None, time.time(), job_id, batch_no),
+        )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def _mark_batch_error(conn: sqlite3.Connection, job_id: int, batch_no: int, exc: Exception) -> None:
+    conn.execute(
+        "UPDATE job_batches SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+        "error = ?, updated_at = ? WHERE job_id = ? AND batch_no = ?",
+        (MAX_ATTEMPTS, f"{type(exc).__name__}: {exc}", time.time(), job_id, batch_no),
+    )
+
+
+def _requeue_running(conn: sqlite3.Connection, job_id: int, shard: Optional[int] = None) -> None:
+    query = (
+        "UPDATE job_batches SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+        "updated_at = ? WHERE job_id = ? AND status = 'running'"
+    )
+    params: list = [MAX_ATTEMPTS, time.time(), job_id]
+    if shard is not None:
+        query += " AND shard = ?"
+        params.append(shard)
+    conn.execute(query, params)
+
+
+def worker_main(db_path: str, job_id: int, shard: int) -> None:
+    conn = connect(db_path)
+    # Katalog görüntüsü worker başına bir kez alınır ve işin sürümüyle aynı olmalı
+    catalogue = get_catalogue()
+    try:
+        try:
+            check_catalogue(conn, job_id, catalogue)
+        except CatalogueMismatch as exc:
+            print(exc, file=sys.stderr, flush=True)
+            sys.exit(EXIT_CATALOGUE_MISMATCH)
+        while True:
+            claimed = _claim_batch(conn, job_id, shard)
+            if claimed is None:
+                return
+            batch_no, user_ids = claimed
+            try:
+                process_batch(conn, job_id, batch_no, user_ids, catalogue=catalogue)
+            except Exception as exc:
+                _mark_batch_error(conn, job_id, batch_no, exc)
+    finally:
+        conn.close()
+
+
+def _format_eta(seconds: float) -> str:
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:d}:{minutes:02d}:{secs:02d}"
+
+
+def run_job(db_path: str, job_id: int, workers: int = 4, report_every: float = 2.0, out=sys.stdout) -> Dict[str, int]:
+    if workers < 1:
+        raise ValueError("workers en az 1 olmalı")
+    conn = connect(db_path)
+    try:
+        check_catalogue(conn, job_id)
+        # Önceki çalıştırmadan "running" kalan batch'ler sahipsizdir (çökme); kuyruğa geri alınır
+        _requeue_running(conn, job_id)
+        shards = [row[0] for row in conn.execute(
+            "SELECT DISTINCT shard FROM job_batches WHERE job_id = ? AND status = 'pending' ORDER BY shard", (job_id,)
+        )]
+        start_done = job_progress(conn, job_id)["done"]
+        started = time.monotonic()
+
+        ctx = multiprocessing.get_context("spawn")
+        pending_shards = list(shards)
+        active: Dict[int, multiprocessing.Process] = {}
+        mismatch = False
+        while pending_shards or active:
+            while pending_shards and len(active) < workers:
+                shard = pending_shards.pop(0)
+                proc = ctx.Process(target=worker_main, args=(db_path, job_id, shard))
+                proc.start()
+                active[shard] = proc
+            for proc in active.values():
+                proc.join(timeout=report_every / max(len(active), 1))
+            for shard, proc in list(active.items()):
+                if proc.is_alive():
+                    continue
+                del active[shard]
+                if proc.exitcode == EXIT_CATALOGUE_MISMATCH:
+                    # Katalog çalışma sırasında değişti: yeni worker başlatılmaz
+                    mismatch = True
+                    pending_shards.clear()
+                elif proc.exitcode != 0:
+                    # Worker öldü: yarım kalan batch tekrar denenir, shard yeni worker'a verilir
+                    _requeue_running(conn, job_id, shard)
+                    if conn.execute(
+                        "SELECT 1 FROM job_batches WHERE job_id = ? AND shard = ? AND status = 'pending' LIMIT 1",
+                        (job_id, shard),
+                    ).fetchone():
+                        pending_shards.append(shard)
+
+            progress = job_progress(conn, job_id)
+            elapsed = time.monotonic() - started
+            rate = (progress["done"] - start_done) / elapsed if elapsed > 0 else 0.0
+            remaining = progress["pending"] + progress["running"]
+            eta = _format_eta(remaining / rate) if rate > 0 else "-"
+            print(
+                f"job {job_id}: {progress['done']}/{progress['total']} kullanıcı, "
+                f"{rate:.1f} plan/sn, ETA {eta}, hata {progress['failed']} batch / {progress['user_errors']} kullanıcı",
+                file=out,
+                flush=True,
+            )
+        if mismatch:
+            # Ebeveynin katalog görüntüsü henüz yenilenmemiş olabilir; worker'ın kararına güvenilir
+            raise CatalogueMismatch(
+                f"job {job_id} katalog {job_catalogue_version(conn, job_id)} için oluşturuldu, "
+                "worker farklı bir aktif katalog buldu; yeni iş için 'enqueue' çalıştırın"
+            )
+        return job_progress(conn, job_id)
+    finally:
+        conn.close()
+
+
+def _positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError("en az 1 olmalı")
+    return number
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m backend.regenerate")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_enqueue = sub.add_parser("enqueue", help="Tüm kullanıcılar için yeni iş oluştur")
+    p_enqueue.add_argument("--batch-size", type=_positive_int, default=200)
+    p_enqueue.add_argument("--shards", type=_positive_int, default=4)
+
+    p_run = sub.add_parser("run", help="İşi çalıştır / çökmeden sonra devam ettir")
+    p_run.add_argument("--job", type=int, default=None, help="Varsayılan: en son bitmemiş iş")
+    p_run.add_argument("--workers", type=_positive_int, default=os.cpu_count() or 1)
+    p_run.add_argument("--report-every", type=float, default=2.0)
+
+    p_status = sub.add_parser("status", help="İş ilerlemesini göster")
+    p_status.add_argument("--job", type=int, default=None)
+
+    args = parser.parse_args(argv)
+    conn = connect(args.db)
+    try:
+        if args.command == "enqueue":
+            job_id = enqueue(conn, batch_size=args.batch_size, shards=args.shards)
+            print(f"job {job_id}: {job_progress(conn, job_id)['total']} kullanıcı kuyrukta")
+            return 0
+        job_id = args.job or latest_unfinished_job(conn)
+        if job_id is None:
+            print("Bitmemiş iş yok")
+            return 0
+        if args.command == "status":
+            print(json.dumps({
+                "job_id": job_id,
+                "catalogue_version": job_catalogue_version(conn, job_id),
+                "active_catalogue_version": get_catalogue().version,
+                **job_progress(conn, job_id),
+            }))
+            return 0
+    finally:
+        conn.close()
+    try:
+        progress = run_job(args.db, job_id, workers=args.workers, report_every=args.report_every)
+    except CatalogueMismatch as exc:
+        print(exc, file=sys.stderr)
+        return 2
+    # Bekleyen / yarım kalan batch varsa iş bitmemiştir
+    incomplete = progress["pending"] or progress["running"]
+    return 1 if progress["failed"] or progress["user_errors"] or incomplete else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,59 @@
+# Plan yanıt formatları için boyut / kodlama süresi karşılaştırması
+# çalıştırma: python scripts/bench_plan_encoding.py [--weeks 60] [--repeat 50]
+import argparse
+import gzip
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from starlette.responses import JSONResponse  # noqa: E402
+
+from api import encoding  # noqa: E402
+from app.models import UserInput  # noqa: E402
+from app.scheduler import generate_plan  # noqa: E402
+
+
+def _time_it(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--weeks", type=int, default=60)
+    parser.add_argument("--hours", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    user = UserInput(name="Bench", track="sayisal", weeks_left=args.weeks, hours_per_week=args.hours, subject_levels={"Matematik": 3})
+    plan = generate_plan(user)
+
+    # Mevcut davranış: eski /plan route'unun döndürdüğü kompakt JSONResponse gövdesi
+    baseline = lambda: JSONResponse(None).render(plan.model_dump(mode="json"))  # noqa: E731
+    variants = [("json (mevcut)", baseline)]
+    variants.append(("json + gzip", lambda: gzip.compress(encoding.encode_body(plan, encoding.JSON_MEDIA_TYPE), encoding.GZIP_LEVEL)))
+    if encoding.brotli is not None:
+        variants.append(("json + br", lambda: encoding.brotli.compress(encoding.encode_body(plan, encoding.JSON_MEDIA_TYPE), quality=encoding.BROTLI_QUALITY)))
+    if encoding.msgpack is not None:
+        variants.append(("msgpack interned", lambda: encoding.pack_interned(plan)))
+        variants.append(("msgpack interned + gzip", lambda: gzip.compress(encoding.pack_interned(plan), encoding.GZIP_LEVEL)))
+        if encoding.brotli is not None:
+            variants.append(("msgpack interned + br", lambda: encoding.brotli.compress(encoding.pack_interned(plan), quality=encoding.BROTLI_QUALITY)))
+    else:
+        print("msgpack kurulu değil, binary format atlandı")
+
+    base_size = len(baseline())
+    print(f"weeks={args.weeks} hours={args.hours} repeat={args.repeat}")
+    print(f"{'format':<26}{'bytes':>10}{'oran':>8}{'ms/encode':>12}")
+    for label, fn in variants:
+        size = len(fn())
+        ms = _time_it(fn, args.repeat)
+        print(f"{label:<26}{size:>10}{size / base_size:>8.2f}{ms:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
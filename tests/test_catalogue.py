@@ -0,0 +1,138 @@
+import json
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api import server
+from app.catalogue import CatalogueError, CatalogueStore, PlanCache, load_catalogue
+from app.models import UserInput
+from app.scheduler import generate_plan
+
+
+def _write(path, data):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+
+
+def _bump_mtime(path):
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+def test_missing_files_are_created_from_defaults(tmp_path):
+    catalogue = load_catalogue(str(tmp_path), create_missing=True)
+    assert set(catalogue.track_weights) == {"sayisal", "ea", "sozel", "dil"}
+    assert (tmp_path / "track_weights.json").exists()
+    assert load_catalogue(str(tmp_path)).version == catalogue.version
+
+
+def test_store_swaps_on_change_and_keeps_old_snapshot(tmp_path):
+    store = CatalogueStore(str(tmp_path), check_interval=0)
+    old = store.current()
+    user = UserInput(track="sayisal", weeks_left=1, hours_per_week=20, subject_levels={"Matematik": 3})
+
+    weights_path = tmp_path / "track_weights.json"
+    weights = json.loads(weights_path.read_text(encoding="utf-8"))
+    weights["sayisal"] = {"Matematik": 1.0}
+    _write(weights_path, weights)
+    _bump_mtime(weights_path)
+
+    new = store.current()
+    assert new.version != old.version
+    # Eski görüntüyü tutan istek eski ağırlıklarla devam eder
+    assert len(generate_plan(user, catalogue=old).weeks[0].subjects) > 1
+    assert [s.subject for s in generate_plan(user, catalogue=new).weeks[0].subjects] == ["Matematik"]
+
+
+def test_invalid_catalogue_is_not_swapped_in(tmp_path):
+    store = CatalogueStore(str(tmp_path), check_interval=0)
+    before = store.current()
+
+    weights_path = tmp_path / "track_weights.json"
+    _write(weights_path, {"sayisal": {"Matematik": 1.0}})  # diğer alanlar eksik
+    _bump_mtime(weights_path)
+
+    assert store.current() is before
+    with pytest.raises(CatalogueError):
+        store.reload()
+    assert store.current() is before
+
+
+def test_missing_file_during_reload_keeps_snapshot(tmp_path):
+    store = CatalogueStore(str(tmp_path), check_interval=0)
+    weights_path = tmp_path / "track_weights.json"
+    weights = json.loads(weights_path.read_text(encoding="utf-8"))
+    weights["sayisal"] = {"Matematik": 1.0}
+    _write(weights_path, weights)
+    _bump_mtime(weights_path)
+    custom = store.current()
+
+    # Editör / deploy sırasında dosya geçici olarak yok: varsayılanlar yazılmamalı
+    weights_path.unlink()
+    assert store.current() is custom
+    assert not weights_path.exists()
+    with pytest.raises(CatalogueError):
+        store.reload()
+    assert store.current() is custom
+
+    _write(weights_path, weights)
+    _bump_mtime(weights_path)
+    assert store.current().track_weights["sayisal"] == {"Matematik": 1.0}
+
+
+def test_plan_cache_is_scoped_to_catalogue_version():
+    cache = PlanCache(max_entries=2)
+    cache.put("v1", "a", 1, current_version="v1")
+    assert cache.get("v1", "a") == 1
+
+    assert cache.get("v2", "a") is None
+    cache.put("v2", "a", 3, current_version="v2")
+    cache.put("v1", "b", 2, current_version="v2")  # eski görüntüyle biten istek yazılmaz
+    assert cache.get("v1", "a") is None and cache.get("v1", "b") is None
+    assert cache.get("v2", "a") == 3
+
+
+@pytest.fixture
+def admin_client(monkeypatch):
+    monkeypatch.setenv("ADMIN_TOKEN", "gizli")
+    return TestClient(server.app)
+
+
+@pytest.mark.parametrize("headers", [{}, {"X-Admin-Token": "yanlis"}])
+def test_admin_reload_requires_token(admin_client, headers):
+    assert admin_client.post("/admin/catalogue/reload", headers=headers).status_code == 403
+
+
+def test_admin_reload_is_disabled_without_configured_token(admin_client, monkeypatch):
+    monkeypatch.delenv("ADMIN_TOKEN")
+    assert admin_client.post("/admin/catalogue/reload", headers={"X-Admin-Token": ""}).status_code == 403
+
+
+def test_admin_reload_reports_invalid_catalogue(admin_client, monkeypatch):
+    def broken():
+        raise CatalogueError("Katalog geçersiz: track_weights eksik alanlar")
+
+    monkeypatch.setattr(server, "reload_catalogue", broken)
+    resp = admin_client.post("/admin/catalogue/reload", headers={"X-Admin-Token": "gizli"})
+    assert resp.status_code == 422
+    assert "track_weights" in resp.json()["detail"]
+
+
+def test_admin_reload_reports_version_change(admin_client, monkeypatch, tmp_path):
+    store = CatalogueStore(str(tmp_path), check_interval=-1)
+    monkeypatch.setattr(server, "get_catalogue", store.current)
+    monkeypatch.setattr(server, "reload_catalogue", store.reload)
+    headers = {"X-Admin-Token": "gizli"}
+
+    body = admin_client.post("/admin/catalogue/reload", headers=headers).json()
+    assert body["changed"] is False and body["version"] == body["previous_version"]
+
+    weights_path = tmp_path / "track_weights.json"
+    weights = json.loads(weights_path.read_text(encoding="utf-8"))
+    weights["sayisal"] = {"Matematik": 1.0}
+    _write(weights_path, weights)
+
+    body = admin_client.post("/admin/catalogue/reload", headers=headers).json()
+    assert body["changed"] is True
+    assert body["version"] == store.current().version != body["previous_version"]
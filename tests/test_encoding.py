@@ -0,0 +1,54 @@
+import gzip
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api import encoding
+from api.server import app
+from app.models import UserInput
+
+client = TestClient(app)
+
+PAYLOAD = UserInput(name="Test", track="sayisal", weeks_left=20, hours_per_week=30, subject_levels={"Matematik": 3}).model_dump()
+
+
+def test_plan_defaults_to_uncompressed_json():
+    resp = client.post("/plan", json=PAYLOAD, headers={"Accept-Encoding": "identity"})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/json")
+    assert "content-encoding" not in resp.headers
+    assert len(resp.json()["weeks"]) == 20
+
+
+def test_plan_gzip_above_threshold():
+    resp = client.post("/plan", json=PAYLOAD, headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in resp.headers["vary"]
+    # TestClient gövdeyi otomatik açar
+    assert len(resp.json()["weeks"]) == 20
+
+
+def test_small_body_is_not_compressed():
+    body, applied = encoding.compress_body(b"{}", "gzip")
+    assert applied is None and body == b"{}"
+    big = b"x" * (encoding.COMPRESS_MIN_BYTES + 1)
+    body, applied = encoding.compress_body(big, "gzip")
+    assert applied == "gzip" and gzip.decompress(body) == big
+
+
+def test_accept_negotiation():
+    assert encoding.choose_content_encoding("gzip;q=0, deflate") is None
+    assert encoding.choose_content_encoding("*") in ("gzip", "br")
+    assert encoding.choose_media_type(None) == encoding.JSON_MEDIA_TYPE
+    assert encoding.choose_media_type("text/html") == encoding.JSON_MEDIA_TYPE
+
+
+def test_msgpack_roundtrip_matches_json():
+    pytest.importorskip("msgpack")
+    resp = client.post("/plan", json=PAYLOAD, headers={"Accept": "application/msgpack", "Accept-Encoding": "identity"})
+    assert resp.headers["content-type"] == encoding.MSGPACK_MEDIA_TYPE
+    decoded = encoding.unpack_interned(resp.content)
+    as_json = client.post("/plan", json=PAYLOAD).json()
+    assert decoded == as_json
+    assert len(resp.content) < len(json.dumps(as_json, ensure_ascii=False).encode("utf-8"))
@@ -0,0 +1,106 @@
+import io
+
+import pytest
+
+from backend import regenerate
+from app.models import UserInput
+
+
+def _seed(conn, count):
+    tracks = ["sayisal", "ea", "sozel", "dil"]
+    for i in range(count):
+        user = UserInput(name=f"u{i}", track=tracks[i % 4], weeks_left=2 + i % 5, hours_per_week=10 + i, subject_levels={"Matematik": 1 + i % 5})
+        regenerate.save_user(conn, f"user-{i:03d}", user)
+
+
+def test_shards_are_stable():
+    assert regenerate.shard_of("user-001", 4) == regenerate.shard_of("user-001", 4)
+    assert {regenerate.shard_of(f"user-{i}", 3) for i in range(50)} == {0, 1, 2}
+
+
+def test_run_resumes_after_crash(tmp_path):
+    db_path = str(tmp_path / "plans.sqlite3")
+    conn = regenerate.connect(db_path)
+    _seed(conn, 30)
+    job_id = regenerate.enqueue(conn, batch_size=4, shards=3)
+    assert regenerate.job_progress(conn, job_id)["pending"] == 30
+
+    # Bir batch işlenmiş, biri "running" iken çökmüş gibi bırak
+    batch_no, user_ids = regenerate._claim_batch(conn, job_id, 0)
+    regenerate.process_batch(conn, job_id, batch_no, user_ids)
+    regenerate._claim_batch(conn, job_id, 1)
+    assert regenerate.latest_unfinished_job(conn) == job_id
+
+    out = io.StringIO()
+    progress = regenerate.run_job(db_path, job_id, workers=2, report_every=0.5, out=out)
+    assert progress["done"] == 30 and progress["failed"] == 0
+    assert "ETA" in out.getvalue()
+    assert conn.execute("SELECT COUNT(*) FROM plans").fetchone()[0] == 30
+    assert regenerate.latest_unfinished_job(conn) is None
+    conn.close()
+
+
+def test_bad_user_does_not_block_batch(tmp_path):
+    db_path = str(tmp_path / "plans.sqlite3")
+    conn = regenerate.connect(db_path)
+    _seed(conn, 5)
+    conn.execute("INSERT INTO users (user_id, input_json) VALUES ('user-002b', '{}')")
+    job_id = regenerate.enqueue(conn, batch_size=10, shards=1)
+    regenerate.worker_main(db_path, job_id, 0)
+
+    progress = regenerate.job_progress(conn, job_id)
+    assert progress["done"] == 6 and progress["failed"] == 0 and progress["user_errors"] == 1
+    assert conn.execute("SELECT COUNT(*) FROM plans").fetchone()[0] == 5
+    user_id, error = conn.execute("SELECT user_id, error FROM job_user_errors WHERE job_id = ?", (job_id,)).fetchone()
+    assert user_id == "user-002b" and error.startswith("ValidationError")
+    conn.close()
+
+
+def test_catalogue_change_after_enqueue_is_refused(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "plans.sqlite3")
+    conn = regenerate.connect(db_path)
+    _seed(conn, 3)
+    job_id = regenerate.enqueue(conn, batch_size=10, shards=1)
+
+    changed = regenerate.get_catalogue().model_copy(update={"version": "baska-surum"})
+    monkeypatch.setattr(regenerate, "get_catalogue", lambda: changed)
+    with pytest.raises(regenerate.CatalogueMismatch):
+        regenerate.run_job(db_path, job_id, workers=1, out=io.StringIO())
+    with pytest.raises(SystemExit) as exc:
+        regenerate.worker_main(db_path, job_id, 0)
+    assert exc.value.code == regenerate.EXIT_CATALOGUE_MISMATCH
+    assert regenerate.job_progress(conn, job_id)["pending"] == 3
+    assert regenerate.main(["--db", db_path, "run", "--job", str(job_id)]) == 2
+    conn.close()
+
+
+def test_worker_mismatch_fails_run_even_if_parent_snapshot_is_stale(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "plans.sqlite3")
+    conn = regenerate.connect(db_path)
+    _seed(conn, 3)
+    job_id = regenerate.enqueue(conn, batch_size=10, shards=1)
+    # Worker diskteki kataloğu görür; ebeveynin kontrolü eski görüntüyle geçmiş gibi davran
+    conn.execute("UPDATE jobs SET catalogue_version = 'eski-surum' WHERE job_id = ?", (job_id,))
+    monkeypatch.setattr(regenerate, "check_catalogue", lambda *args, **kwargs: None)
+    with pytest.raises(regenerate.CatalogueMismatch):
+        regenerate.run_job(db_path, job_id, workers=1, report_every=0.2, out=io.StringIO())
+    assert regenerate.job_progress(conn, job_id)["pending"] == 3
+    conn.close()
+
+
+def test_cli_exits_non_zero_when_job_incomplete(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "plans.sqlite3")
+    conn = regenerate.connect(db_path)
+    _seed(conn, 3)
+    job_id = regenerate.enqueue(conn, batch_size=10, shards=1)
+    conn.close()
+    progress = {"pending": 3, "running": 0, "done": 0, "failed": 0, "total": 3, "user_errors": 0}
+    monkeypatch.setattr(regenerate, "run_job", lambda *args, **kwargs: progress)
+    assert regenerate.main(["--db", db_path, "run", "--job", str(job_id)]) == 1
+
+
+@pytest.mark.parametrize("args", [["run", "--workers", "0"], ["enqueue", "--shards", "0"], ["enqueue", "--batch-size", "-1"]])
+def test_cli_rejects_non_positive_counts(tmp_path, args):
+    with pytest.raises(SystemExit) as exc:
+        regenerate.main(["--db", str(tmp_path / "plans.sqlite3")] + args)
+    assert exc.value.code == 2
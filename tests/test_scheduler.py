@@ -64,3 +64,24 @@ def test_weighting_levels_affect_distribution():
     math_high = weekly_total(high_plan, "Matematik")
 
     assert math_low != math_high
+
+
+def test_sweep_matches_generate_plan():
+    from app.models import SweepRange, SweepRequest
+    from app.scheduler import sweep_allocations
+
+    user = UserInput(name="Sweep", track="sozel", weeks_left=3, hours_per_week=20, subject_levels={"Türkçe": 2})
+    result = sweep_allocations(SweepRequest(
+        user=user,
+        hours_per_week=SweepRange(min=1, max=40, step=3),
+        weeks_left=SweepRange(min=1, max=12),
+    ))
+
+    assert result.weeks_left == list(range(1, 13))
+    assert len(result.weekly_hours) == len(result.hours_per_week) == len(result.topics_per_week)
+    for h_idx, hours in enumerate(result.hours_per_week):
+        plan = generate_plan(user.model_copy(update={"hours_per_week": hours, "weeks_left": 2}))
+        expected = {sp.subject: sp for sp in plan.weeks[0].subjects}
+        for s_idx, subject in enumerate(result.subjects):
+            assert result.weekly_hours[h_idx][s_idx] == expected[subject].weekly_hours
+            assert result.topics_per_week[h_idx][s_idx] == len(expected[subject].topics)
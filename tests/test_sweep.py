@@ -0,0 +1,71 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from api import encoding, server
+from api.server import app
+from app.models import SweepRequest, UserInput
+from app.scheduler import sweep_allocations
+
+client = TestClient(app)
+
+USER = UserInput(track="sayisal", weeks_left=1, hours_per_week=1, subject_levels={"Matematik": 3}).model_dump()
+
+
+def _payload(hours=(1, 40), weeks=(1, 20)):
+    return {
+        "user": USER,
+        "hours_per_week": {"min": hours[0], "max": hours[1]},
+        "weeks_left": {"min": weeks[0], "max": weeks[1]},
+    }
+
+
+def test_sweep_returns_full_grid():
+    resp = client.post("/plan/sweep", json=_payload(), headers={"Accept-Encoding": "identity"})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["hours_per_week"] == list(range(1, 41))
+    assert body["weeks_left"] == list(range(1, 21))
+    assert len(body["weekly_hours"]) == 40
+    assert all(len(row) == len(body["subjects"]) for row in body["weekly_hours"])
+    assert body == sweep_allocations(SweepRequest(**_payload())).model_dump()
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        _payload(hours=(1, 90)),  # UserInput sınırı 80
+        _payload(weeks=(1, 61)),
+        _payload(hours=(40, 10)),  # max < min
+    ],
+)
+def test_sweep_rejects_invalid_ranges(payload):
+    assert client.post("/plan/sweep", json=payload).status_code == 422
+
+
+def test_sweep_is_served_from_plan_cache(monkeypatch):
+    server.plan_cache.clear()
+    calls = []
+
+    def counting(request, catalogue=None):
+        calls.append(request)
+        return sweep_allocations(request, catalogue=catalogue)
+
+    monkeypatch.setattr(server, "sweep_allocations", counting)
+    first = client.post("/plan/sweep", json=_payload(hours=(5, 15)))
+    second = client.post("/plan/sweep", json=_payload(hours=(5, 15)))
+    assert first.json() == second.json()
+    assert len(calls) == 1
+
+
+def test_sweep_negotiates_encoding():
+    resp = client.post("/plan/sweep", json=_payload(hours=(1, 80), weeks=(1, 60)), headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["content-encoding"] == "gzip"
+    assert len(resp.json()["weekly_hours"]) == 80
+
+
+def test_sweep_msgpack_matches_json():
+    pytest.importorskip("msgpack")
+    as_json = client.post("/plan/sweep", json=_payload()).json()
+    resp = client.post("/plan/sweep", json=_payload(), headers={"Accept": "application/msgpack", "Accept-Encoding": "identity"})
+    assert resp.headers["content-type"].startswith("application/msgpack")
+    assert encoding.unpack_interned(resp.content) == as_json
@@ -0,0 +1,98 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import tracing
+from api.server import app
+from app.models import UserInput
+from app.scheduler import generate_plan
+
+PAYLOAD = UserInput(track="ea", weeks_left=2, hours_per_week=12, subject_levels={"Matematik": 2}).model_dump()
+
+
+@pytest.fixture
+def exporter():
+    exporter = tracing.InMemoryExporter()
+    previous = tracing.get_exporter()
+    tracing.configure(sample_rate=0.0, exporter=exporter, trust_parent=False)
+    yield exporter
+    tracing.configure(sample_rate=0.0, exporter=previous, trust_parent=False)
+
+
+def test_disabled_tracing_records_nothing(exporter):
+    with tracing.start_trace("root") as root:
+        assert root is None
+        generate_plan(UserInput(**PAYLOAD))
+        assert tracing.inject_headers() == {}
+    assert exporter.spans() == []
+
+
+def test_sampled_trace_nests_scheduler_spans(exporter):
+    tracing.configure(sample_rate=1.0)
+    with tracing.start_trace("root") as root:
+        generate_plan(UserInput(**PAYLOAD))
+    spans = exporter.spans(root.trace_id)
+    by_name = {s.name: s for s in spans}
+    assert by_name["scheduler.generate_plan"].parent_id == root.span_id
+    assert by_name["scheduler._allocate_weekly_hours"].parent_id == by_name["scheduler.generate_plan"].span_id
+    assert all(s.duration_ms >= 0 for s in spans)
+    # Ders başına yardımcılar span açmaz, hafta span'inde toplanır
+    assert "scheduler._pick_topics_for_subject" not in by_name
+    week = by_name["scheduler._build_week_plan"]
+    assert week.attributes["subjects"] > 0
+    assert week.attributes["pick_topics_ms"] >= 0
+
+
+def test_file_exporter_writes_each_trace_once(exporter, tmp_path):
+    path = tmp_path / "trace.jsonl"
+    file_exporter = tracing.FileExporter(str(path))
+    tracing.configure(sample_rate=1.0, exporter=file_exporter)
+    with tracing.start_trace("first") as first:
+        generate_plan(UserInput(**PAYLOAD))
+        assert not path.exists()  # kök span kapanmadan dosyaya yazılmaz
+    with tracing.start_trace("second") as second:
+        generate_plan(UserInput(**PAYLOAD))
+    file_exporter.close()
+
+    lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    trace_ids = [line["trace_id"] for line in lines]
+    # Her trace bitişik bir blok halinde, kök span en sonda
+    split = trace_ids.index(second.trace_id)
+    assert set(trace_ids[:split]) == {first.trace_id}
+    assert set(trace_ids[split:]) == {second.trace_id}
+    assert lines[split - 1]["name"] == "first" and lines[-1]["name"] == "second"
+
+
+def test_sampled_traceparent_ignored_when_disabled(exporter):
+    tracing.configure(trust_parent=True)
+    client = TestClient(app)
+    headers = {"traceparent": "00-" + "e" * 32 + "-" + "f" * 16 + "-01"}
+    assert client.post("/plan", json=PAYLOAD, headers=headers).status_code == 200
+    assert exporter.spans() == []
+
+
+def test_untrusted_parent_cannot_force_sampling(exporter, monkeypatch):
+    tracing.configure(sample_rate=0.5)
+    monkeypatch.setattr(tracing.random, "random", lambda: 0.9)  # yerel karar: örneklenmez
+    with tracing.start_trace("api", traceparent="00-" + "e" * 32 + "-" + "f" * 16 + "-01") as root:
+        assert root is None
+    assert exporter.spans() == []
+
+
+def test_traceparent_propagates_through_api(exporter):
+    tracing.configure(sample_rate=0.01, trust_parent=True)
+    client = TestClient(app)
+    with tracing.start_trace("ui", traceparent="00-" + "a" * 32 + "-" + "b" * 16 + "-01"):
+        headers = tracing.inject_headers()
+    assert headers["traceparent"].startswith("00-" + "a" * 32)
+
+    resp = client.post("/plan/one-week", json=PAYLOAD, headers=headers)
+    assert resp.status_code == 200
+    names = {s.name for s in exporter.spans("a" * 32)}
+    assert {"http POST /plan/one-week", "route POST /plan/one-week", "plan.build", "response.encode", "scheduler.generate_one_week_plan"} <= names
+
+    # Örneklenmemiş (flags=00) üst trace alt tarafta da kayıt üretmez
+    exporter.clear()
+    client.post("/plan/one-week", json=PAYLOAD, headers={"traceparent": "00-" + "c" * 32 + "-" + "d" * 16 + "-00"})
+    assert exporter.spans() == []